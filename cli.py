@@ -11,19 +11,17 @@ from pathlib import Path
 
 from warships_database import WarshipsDatabase
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
-
-
 def main() -> None:
     """CLI entry point: automatically create and populate the database."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
     db_path = str(Path("warships.db").resolve())
 
     try:
-        with WarshipsDatabase(db_path=db_path) as db:
+        with WarshipsDatabase(db_path=db_path, fast_bulk=True) as db:
             logging.info("Creating and populating the database...")
             db.populate_all()
             logging.info(f"Database ready at '{db_path}'.")
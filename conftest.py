@@ -2,16 +2,27 @@ from __future__ import annotations
 
 import logging
 import random
-import shutil
+import sqlite3
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
 import pytest
 from _pytest.tmpdir import TempPathFactory
+from filelock import FileLock
 
 from config import DatabaseConfig, ValueRange
 from warships_database import WarshipsDatabase
 
+# Fixed seeds so every pytest-xdist worker derives an identical original
+# database and randomized copy when it rebuilds the session fixtures.
+ORIGINAL_DB_SEED: int = 4242
+RANDOMIZATION_SEED: int = 1337
+_rng = random.Random(RANDOMIZATION_SEED)
+
+# Value bounds bound once at import; used in the per-row randomization loop.
+_MIN_VALUE = ValueRange.MIN_VALUE.value
+_MAX_VALUE = ValueRange.MAX_VALUE.value
+
 # ------------------------------------ Logger setup ------------------------------------
 logging.basicConfig(
     level=logging.INFO,
@@ -22,10 +33,14 @@ logger = logging.getLogger(__name__)
 
 
 # ------------------------------------ Helper functions ------------------------------------
-def ensure_database_exists() -> str:
+def ensure_database_exists(lock_dir: Path) -> str:
     """
     Ensure the original database exists and is populated.
 
+    Args:
+        lock_dir (Path): Directory shared by all pytest-xdist workers,
+            used for the cross-worker build lock.
+
     Returns:
         str: Absolute path to the original database.
 
@@ -33,12 +48,29 @@ def ensure_database_exists() -> str:
         Exception: If database creation or population fails.
     """
     db_path = Path(DatabaseConfig.DB_NAME.value).resolve()
+    # Serialize the build across xdist workers: without the lock, workers
+    # starting on a fresh tree race to recreate the schema and interleave
+    # their DDL. The populated check runs after acquiring the lock, so
+    # late workers find the finished database and skip the rebuild;
+    # seeding makes every worker agree on the generated content either way.
     try:
-        with WarshipsDatabase(str(db_path)) as db:
-            db.create_schema()
+        with FileLock(str(lock_dir / "warships_build.lock")), \
+                WarshipsDatabase(str(db_path), seed=ORIGINAL_DB_SEED) as db:
+            # create_schema drops and recreates tables, so only invoke the
+            # full rebuild when a populated ships table with the current
+            # INTEGER-key layout is present. A pre-series database (TEXT
+            # keys) must be regenerated, not reused.
             cursor = db.connection.cursor()
-            cursor.execute("SELECT COUNT(*) FROM ships")
-            if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'ships'")
+            populated = False
+            if cursor.fetchone() is not None:
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(ships)")}
+                if "ship_id" in columns:
+                    cursor.execute("SELECT COUNT(*) FROM ships")
+                    populated = cursor.fetchone()[0] > 0
+                else:
+                    logger.info("Found outdated database schema; rebuilding.")
+            if not populated:
                 logger.info("Populating original database...")
                 db.populate_all()
                 logger.info("Original database populated successfully.")
@@ -62,6 +94,9 @@ def randomize_table(
     Each row will have **one** randomly selected column from `params`
     set to a random integer between ValueRange.MIN_VALUE and ValueRange.MAX_VALUE.
 
+    Rows are bucketed by their chosen column so each column needs only one
+    executemany call with a static SQL string, instead of one UPDATE per row.
+
     Args:
         db_instance (WarshipsDatabase): Open database connection.
         table_name (str): Name of the table to randomize.
@@ -73,18 +108,31 @@ def randomize_table(
     """
     try:
         cursor = db_instance.connection.cursor()
-        cursor.execute(f"SELECT {key_column} FROM {table_name}")
-        row_keys = [row[0] for row in cursor.fetchall()]
+        # Stream the cursor directly instead of materializing fetchall() first.
+        row_keys = [key for (key,) in cursor.execute(f"SELECT {key_column} FROM {table_name}")]
 
+        buckets: Dict[str, List[Tuple[int, int]]] = {column: [] for column in params}
         for component_key in row_keys:
-            column_name = random.choice(params)
-            random_value = random.randint(ValueRange.MIN_VALUE.value, ValueRange.MAX_VALUE.value)
-            cursor.execute(
-                f"UPDATE {table_name} SET {column_name} = ? WHERE {key_column} = ?",
-                (random_value, component_key)
-            )
+            column_name = _rng.choice(params)
+            random_value = _rng.randint(_MIN_VALUE, _MAX_VALUE)
+            buckets[column_name].append((random_value, component_key))
+
+        # Single transaction: commit once for the whole table instead of per
+        # UPDATE. The connection runs with isolation_level=None, so the
+        # transaction boundaries are issued explicitly.
+        cursor.execute("BEGIN;")
+        try:
+            for column_name, bucket in buckets.items():
+                if bucket:
+                    cursor.executemany(
+                        f"UPDATE {table_name} SET {column_name} = ? WHERE {key_column} = ?",
+                        bucket
+                    )
+            cursor.execute("COMMIT;")
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            raise
 
-        db_instance.connection.commit()
         logger.info(f"Randomized table '{table_name}' successfully ({len(row_keys)} rows updated).")
 
     except Exception as e:
@@ -104,13 +152,23 @@ def randomized_database(tmp_path_factory: TempPathFactory) -> str:
     Raises:
         Exception: If database copy or randomization fails.
     """
-    original_db = ensure_database_exists()
+    # getbasetemp().parent is shared by all xdist workers (each worker's
+    # own basetemp is a private subdirectory of it).
+    original_db = ensure_database_exists(tmp_path_factory.getbasetemp().parent)
 
     tmp_db_folder = tmp_path_factory.mktemp("data")
     tmp_db_path = tmp_db_folder / "warships_randomized.db"
 
     try:
-        shutil.copy(original_db, tmp_db_path)
+        # backup() copies live pages at the SQLite level, so the snapshot is
+        # consistent even with WAL content a plain file copy would miss.
+        source = sqlite3.connect(original_db)
+        target = sqlite3.connect(str(tmp_db_path))
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
         logger.info(f"Copied original database to temporary path: {tmp_db_path}")
 
         # Randomize each component table
@@ -119,10 +177,10 @@ def randomized_database(tmp_path_factory: TempPathFactory) -> str:
                 db,
                 "weapons",
                 ["reload_speed", "rotational_speed", "diameter", "power_volley", "count"],
-                "weapon"
+                "weapon_id"
             )
-            randomize_table(db, "hulls", ["armor", "type", "capacity"], "hull")
-            randomize_table(db, "engines", ["power", "type"], "engine")
+            randomize_table(db, "hulls", ["armor", "type", "capacity"], "hull_id")
+            randomize_table(db, "engines", ["power", "type"], "engine_id")
 
         logger.info("Randomized database ready for tests.")
 
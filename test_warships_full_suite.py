@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from typing import Generator, List, Tuple
+from typing import Dict, Generator, List, Tuple
 
 import pytest
 
@@ -11,13 +11,17 @@ from config import DatabaseConfig, TableSizes
 # ------------------------------------ Logging configuration ------------------------------------
 # Only essential session-wide events use INFO.
 # Per-ship execution logs are DEBUG to avoid clutter in test reports.
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+# Handler setup lives in conftest.py; configuring it here too would attach
+# duplicate handlers when pytest imports the module.
 logger = logging.getLogger(__name__)
 
+# Keep all comparison tests on one pytest-xdist worker so a single
+# randomized-copy session fixture serves the whole group under `-n auto`.
+pytestmark = pytest.mark.xdist_group("randomized_db")
+
+# Bound once at import so the per-ship loop does not re-resolve the enum.
+N_SHIPS: int = TableSizes.SHIPS.value
+
 
 # ------------------------------------ Component field mapping ------------------------------------
 COMPONENTS: dict[str, List[str]] = {
@@ -26,6 +30,31 @@ COMPONENTS: dict[str, List[str]] = {
     "engines": ["power", "type"]
 }
 
+# Entity-name prefix per table: keys are INTEGER ids in the schema, so the
+# task's "Weapon-N" style names are derived only for failure reporting.
+ENTITY_PREFIX: dict[str, str] = {
+    "weapons": "Weapon",
+    "hulls": "Hull",
+    "engines": "Engine"
+}
+
+# Pre-built SQL: one static string per table, so sqlite3's statement cache
+# always hits on the exact text instead of recompiling f-string variants.
+# The randomized copy is ATTACHed as `rnd`, so each statement joins ships
+# to its component table on both sides and returns the original FK, the
+# randomized FK, and both value tuples for every ship in one pass.
+JOIN_PAIR_SELECT: dict[str, str] = {
+    table: (
+        f"SELECT s.ship_id, s.{table[:-1]}_id, r.{table[:-1]}_id, "
+        f"{', '.join(f'o.{field}, n.{field}' for field in fields)} "
+        f"FROM ships s "
+        f"JOIN rnd.ships r USING (ship_id) "
+        f"JOIN {table} o ON s.{table[:-1]}_id = o.{table[:-1]}_id "
+        f"JOIN rnd.{table} n ON s.{table[:-1]}_id = n.{table[:-1]}_id"
+    )
+    for table, fields in COMPONENTS.items()
+}
+
 
 # ------------------------------------ Fixtures ----------------------------------------------
 @pytest.fixture(scope="session")
@@ -34,7 +63,7 @@ def original_db_connection() -> Generator[sqlite3.Connection, None, None]:
     Provides a persistent connection to the original database for comparison.
     Guaranteed to close safely after the entire test session completes.
     """
-    connection: sqlite3.Connection = sqlite3.connect(DatabaseConfig.DB_NAME.value)
+    connection: sqlite3.Connection = sqlite3.connect(DatabaseConfig.DB_NAME.value, cached_statements=256)
     logger.info("Connected to original database for test validation.")
     try:
         yield connection
@@ -49,111 +78,103 @@ def db_component_tables() -> List[str]:
     return list(COMPONENTS.keys())
 
 
+# ------------------------------------ Snapshot helpers ------------------------------------
+# Paired snapshot: per table, each ship id maps to its original FK id,
+# randomized FK id, and the (original, randomized) component value tuples.
+ShipEntry = Tuple[int, int, Tuple[int, ...], Tuple[int, ...]]
+Snapshot = Dict[str, Dict[int, ShipEntry]]
+
+
+@pytest.fixture(scope="session")
+def paired_snapshot(
+    original_db_connection: sqlite3.Connection,
+    randomized_database: str
+) -> Snapshot:
+    """
+    Session-wide in-memory snapshot pairing original and randomized rows.
+
+    The randomized copy is ATTACHed to the original connection so one
+    cross-DB JOIN per table resolves each ship's FK reference and fetches
+    both component value tuples at once; SQLite does the row matching in
+    C and Python only builds the lookup dicts.
+    """
+    cursor = original_db_connection.cursor()
+    cursor.execute("ATTACH DATABASE ? AS rnd", (randomized_database,))
+    try:
+        snapshot: Snapshot = {}
+        for table in COMPONENTS:
+            cursor.execute(JOIN_PAIR_SELECT[table])
+            snapshot[table] = {
+                row[0]: (row[1], row[2], tuple(row[3::2]), tuple(row[4::2]))
+                for row in cursor.fetchall()
+            }
+    finally:
+        cursor.execute("DETACH DATABASE rnd")
+
+    logger.info("Loaded paired original/randomized snapshot into memory.")
+    return snapshot
+
+
 # ------------------------------------ Component validation tests ------------------------------------
-@pytest.mark.parametrize(
-    "ship_number, component_table, checked_fields",
-    [
-        (idx, table, COMPONENTS[table])
-        for idx in range(1, TableSizes.SHIPS.value + 1)
-        for table in COMPONENTS.keys()
-    ]
-)
+@pytest.mark.parametrize("component_table", list(COMPONENTS))
 def test_ship_components(
-    ship_number: int,
     component_table: str,
-    checked_fields: List[str],
-    original_db_connection: sqlite3.Connection,
-    randomized_database: str
+    paired_snapshot: Snapshot
 ) -> None:
     """
     Validates that randomized database copy meets component randomization test criteria.
 
+    One test item per component table, looping over all ships internally;
+    this keeps pytest collection and fixture dispatch to 3 items instead
+    of 600. All lookups run against session-scoped in-memory snapshots,
+    so the test body performs no SQLite queries of its own.
+
     Failure cases:
         1) A component attribute value differs from the original database state.
         2) A ship's FK reference (weapon, hull, or engine) was reassigned to a different component.
 
     Expected failure output must strictly match the provided Wargaming task format.
+    Mismatches are collected across all ships and reported in one failure.
     """
-    logger.debug(f"--- Running component validation: Ship-{ship_number}, table='{component_table}' ---")
+    logger.debug("--- Running component validation for table '%s' ---", component_table)
 
-    rand_conn: sqlite3.Connection = sqlite3.connect(randomized_database)
-    try:
-        orig_cursor = original_db_connection.cursor()
-        rand_cursor = rand_conn.cursor()
-
-        # Original FK lookup
-        orig_cursor.execute(
-            "SELECT weapon, hull, engine FROM ships WHERE ship = ?",
-            (f"Ship-{ship_number}",)
-        )
-        orig_fks: Tuple[str, str, str] | None = orig_cursor.fetchone()
-        assert orig_fks is not None, f"Original DB missing row for Ship-{ship_number}"
-
-        active_fk = {
-            "weapons": orig_fks[0],
-            "hulls": orig_fks[1],
-            "engines": orig_fks[2]
-        }[component_table]
-
-        # Component values lookup (original)
-        pk_column = component_table[:-1]
-        orig_cursor.execute(
-            f"SELECT {', '.join(checked_fields)} FROM {component_table} WHERE {pk_column} = ?",
-            (active_fk,)
-        )
-        orig_vals: Tuple[int, ...] | None = orig_cursor.fetchone()
-        assert orig_vals is not None, f"Original component row missing for {active_fk}"
-
-        # Component values lookup (randomized)
-        rand_cursor.execute(
-            f"SELECT {', '.join(checked_fields)} FROM {component_table} WHERE {pk_column} = ?",
-            (active_fk,)
-        )
-        rand_vals: Tuple[int, ...] | None = rand_cursor.fetchone()
-        assert rand_vals is not None, f"Randomized component row missing for {active_fk}"
+    table_snapshot = paired_snapshot[component_table]
+    checked_fields = COMPONENTS[component_table]
+    prefix = ENTITY_PREFIX[component_table]
+    failures: List[str] = []
+
+    for ship_number in range(1, N_SHIPS + 1):
+        # One snapshot entry carries FK ids and component values for both sides
+        entry = table_snapshot.get(ship_number)
+        assert entry is not None, f"Snapshot missing row for Ship-{ship_number}"
+        active_fk_id, rand_active_fk_id, orig_vals, rand_vals = entry
+        active_fk = f"{prefix}-{active_fk_id}"
 
         # 1) Field comparison block
-        logger.debug("Comparing field values between original and randomized database...")
         for field, expected_val, actual_val in zip(checked_fields, orig_vals, rand_vals):
             if expected_val != actual_val:
                 logger.error(
-                    f"Component attribute mismatch for {active_fk} ({field}): expected={expected_val}, actual={actual_val}"
+                    "Component attribute mismatch for %s (%s): expected=%s, actual=%s",
+                    active_fk, field, expected_val, actual_val
                 )
-                pytest.fail(
+                failures.append(
                     f"Ship-{ship_number}, {active_fk}\n"
                     f"    {field}: expected {expected_val}, was {actual_val}"
                 )
 
         # 2) FK reassignment detection block
-        logger.debug("Checking that ship FK reference was not reassigned...")
-        rand_cursor.execute(
-            "SELECT weapon, hull, engine FROM ships WHERE ship = ?",
-            (f"Ship-{ship_number}", )
-        )
-        rand_fks: Tuple[str, str, str] | None = rand_cursor.fetchone()
-        assert rand_fks is not None, f"Randomized DB missing row for Ship-{ship_number}"
-
-        rand_active_fk = {
-            "weapons": rand_fks[0],
-            "hulls": rand_fks[1],
-            "engines": rand_fks[2]
-        }[component_table]
-
-        if active_fk != rand_active_fk:
+        if active_fk_id != rand_active_fk_id:
+            rand_active_fk = f"{prefix}-{rand_active_fk_id}"
             logger.error(
-                f"FK reference reassigned for Ship-{ship_number}: expected {active_fk}, found {rand_active_fk}"
+                "FK reference reassigned for Ship-%s: expected %s, found %s",
+                ship_number, active_fk, rand_active_fk
             )
-            pytest.fail(
+            failures.append(
                 f"Ship-{ship_number}, {active_fk}\n"
                 f"    expected {active_fk}, was {rand_active_fk}"
             )
 
-        logger.debug(f"Component intact for Ship-{ship_number} ({active_fk})")
-
-    except Exception as ex:
-        logger.exception(f"Unexpected failure validating Ship-{ship_number}: {ex}")
-        raise
+    if failures:
+        pytest.fail("\n".join(failures))
 
-    finally:
-        rand_conn.close()
-        logger.debug(f"Randomized DB connection closed for Ship-{ship_number}")
+    logger.debug("All ship components intact for table '%s'", component_table)
@@ -7,6 +7,7 @@ Handles creation and population of the Warships SQLite database.
 import logging
 import random
 import sqlite3
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -14,14 +15,88 @@ from config import DatabaseConfig, TableSizes, ValueRange
 
 logger = logging.getLogger(__name__)
 
+# Hot-path constants: enum attribute access costs two dict lookups per use,
+# so the sizes and value bounds are bound once at import.
+_MIN_VALUE = ValueRange.MIN_VALUE.value
+_MAX_VALUE = ValueRange.MAX_VALUE.value
+_N_SHIPS = TableSizes.SHIPS.value
+_N_WEAPONS = TableSizes.WEAPONS.value
+_N_HULLS = TableSizes.HULLS.value
+_N_ENGINES = TableSizes.ENGINES.value
+
+# Full DDL in one script: executescript dispatches it to SQLite in a single
+# call (and commits implicitly, so PRAGMAs stay out of it).
+SCHEMA_SQL = """
+    DROP TABLE IF EXISTS ships;
+    DROP TABLE IF EXISTS weapons;
+    DROP TABLE IF EXISTS hulls;
+    DROP TABLE IF EXISTS engines;
+    CREATE TABLE weapons (
+        weapon_id INTEGER PRIMARY KEY,
+        reload_speed INTEGER,
+        rotational_speed INTEGER,
+        diameter INTEGER,
+        power_volley INTEGER,
+        count INTEGER
+    );
+    CREATE TABLE hulls (
+        hull_id INTEGER PRIMARY KEY,
+        armor INTEGER,
+        type INTEGER,
+        capacity INTEGER
+    );
+    CREATE TABLE engines (
+        engine_id INTEGER PRIMARY KEY,
+        power INTEGER,
+        type INTEGER
+    );
+    CREATE TABLE ships (
+        ship_id INTEGER PRIMARY KEY,
+        weapon_id INTEGER REFERENCES weapons(weapon_id),
+        hull_id INTEGER REFERENCES hulls(hull_id),
+        engine_id INTEGER REFERENCES engines(engine_id)
+    );
+"""
+
 
 class WarshipsDatabase:
     """Manages Warships SQLite database: schema creation, population, cleanup."""
 
-    def __init__(self, db_path: Optional[str] = None):
-        self.db_path: str = str(Path(db_path or DatabaseConfig.DB_NAME.value).resolve())
-        self.connection: sqlite3.Connection = sqlite3.connect(self.db_path, check_same_thread=False)
+    def __init__(self, db_path: Optional[str] = None, fast_bulk: bool = False, seed: Optional[int] = None):
+        # Keep the caller-supplied path as-is; resolving it stats the
+        # filesystem and sqlite3 accepts relative paths directly.
+        self.db_path: str = db_path or DatabaseConfig.DB_NAME.value
+        # Dedicated RNG: seeding it makes generated attribute columns and FK
+        # assignments fully reproducible without touching the global state.
+        self._rng = random.Random(seed)
+        # isolation_level=None disables the driver's implicit-transaction
+        # heuristics; populate_all manages BEGIN/COMMIT explicitly.
+        # check_same_thread=False permits a single-writer/multi-reader split
+        # across threads; callers sharing the connection must serialize access.
+        self.connection: sqlite3.Connection = sqlite3.connect(
+            self.db_path, isolation_level=None, cached_statements=256, check_same_thread=False
+        )
+        # page_size only takes effect while the DB file is still empty, and
+        # cannot change once WAL mode is active, so it goes first.
+        self.connection.execute("PRAGMA page_size = 8192;")
         self.connection.execute("PRAGMA foreign_keys = ON;")
+        if fast_bulk:
+            # Throwaway generator runs: skip journal/fsync safety for maximum insert speed.
+            self.connection.execute("PRAGMA journal_mode = MEMORY;")
+            self.connection.execute("PRAGMA synchronous = OFF;")
+        else:
+            self.connection.execute("PRAGMA journal_mode = WAL;")
+            self.connection.execute("PRAGMA synchronous = NORMAL;")
+        self.connection.execute("PRAGMA temp_store = MEMORY;")
+        self.connection.execute("PRAGMA cache_size = -65536;")
+        # Memory-mapped reads (256 MiB window) skip page-cache copies for any
+        # follow-on SELECTs in the same process.
+        self.connection.execute("PRAGMA mmap_size = 268435456;")
+
+    @cached_property
+    def resolved_path(self) -> str:
+        """Absolute path to the database file, resolved lazily for logging."""
+        return str(Path(self.db_path).resolve())
 
     # ------------------------------------ Context manager ------------------------------------
     def __enter__(self) -> "WarshipsDatabase":
@@ -32,127 +107,149 @@ class WarshipsDatabase:
 
     # ------------------------------------ Schema creation ------------------------------------
     def create_schema(self) -> None:
-        cursor = self.connection.cursor()
+        """Recreate all tables from scratch, guaranteeing they start empty.
+
+        Starting from empty tables lets the populate methods use plain
+        INSERT instead of INSERT OR REPLACE, skipping the per-row
+        existing-key probe.
+
+        The DDL runs on its own short-lived connection: DDL statements
+        implicitly commit any open transaction, so keeping them off
+        self.connection guarantees the single BEGIN/COMMIT around the bulk
+        inserts can never be silently broken by schema changes.
+        """
         try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS weapons (
-                    weapon TEXT PRIMARY KEY,
-                    reload_speed INTEGER,
-                    rotational_speed INTEGER,
-                    diameter INTEGER,
-                    power_volley INTEGER,
-                    count INTEGER
-                );
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS hulls (
-                    hull TEXT PRIMARY KEY,
-                    armor INTEGER,
-                    type INTEGER,
-                    capacity INTEGER
-                );
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS engines (
-                    engine TEXT PRIMARY KEY,
-                    power INTEGER,
-                    type INTEGER
-                );
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ships (
-                    ship TEXT PRIMARY KEY,
-                    weapon TEXT,
-                    hull TEXT,
-                    engine TEXT,
-                    FOREIGN KEY (weapon) REFERENCES weapons(weapon),
-                    FOREIGN KEY (hull) REFERENCES hulls(hull),
-                    FOREIGN KEY (engine) REFERENCES engines(engine)
-                );
-            """)
-            self.connection.commit()
+            ddl_connection = sqlite3.connect(self.db_path)
+            try:
+                # Match the main connection's page size in case the file
+                # does not exist yet when the DDL connection creates it.
+                ddl_connection.execute("PRAGMA page_size = 8192;")
+                ddl_connection.executescript(SCHEMA_SQL)
+            finally:
+                ddl_connection.close()
             logger.info("Database schema created successfully.")
         except sqlite3.Error as e:
             logger.error(f"Failed to create schema: {e}")
             raise
 
     # ------------------------------------ Helper utilities ------------------------------------
-    @staticmethod
-    def _rand() -> int:
-        return random.randint(ValueRange.MIN_VALUE.value, ValueRange.MAX_VALUE.value)
-
-    @staticmethod
-    def _name(entity: str, idx: int) -> str:
-        return f"{entity}-{idx}"
+    def _rand_column(self, count: int) -> list[int]:
+        """Draw `count` random attribute values in one batched C-level call."""
+        value_range = range(_MIN_VALUE, _MAX_VALUE + 1)
+        return self._rng.choices(value_range, k=count)
 
     # ------------------------------------ Population methods ------------------------------------
-    def populate_weapons(self) -> None:
-        cursor = self.connection.cursor()
+    def populate_weapons(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        connection = connection or self.connection
         try:
-            for i in range(1, TableSizes.WEAPONS.value + 1):
-                name = self._name("Weapon", i)
-                values = (self._rand(), self._rand(), self._rand(), self._rand(), self._rand())
-                cursor.execute("INSERT OR REPLACE INTO weapons VALUES (?, ?, ?, ?, ?, ?);", (name, *values))
-            self.connection.commit()
-            logger.info(f"Populated {TableSizes.WEAPONS.value} weapons.")
+            count = _N_WEAPONS
+            columns = [self._rand_column(count) for _ in range(5)]
+            # executemany consumes the zip iterator directly; no row list needed.
+            connection.executemany("INSERT INTO weapons VALUES (?, ?, ?, ?, ?, ?);", zip(range(1, count + 1), *columns))
+            logger.info(f"Populated {_N_WEAPONS} weapons.")
         except sqlite3.Error as e:
             logger.error(f"Error populating weapons: {e}")
             raise
 
-    def populate_hulls(self) -> None:
-        cursor = self.connection.cursor()
+    def populate_hulls(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        connection = connection or self.connection
         try:
-            for i in range(1, TableSizes.HULLS.value + 1):
-                name = self._name("Hull", i)
-                values = (self._rand(), self._rand(), self._rand())
-                cursor.execute("INSERT OR REPLACE INTO hulls VALUES (?, ?, ?, ?);", (name, *values))
-            self.connection.commit()
-            logger.info(f"Populated {TableSizes.HULLS.value} hulls.")
+            count = _N_HULLS
+            columns = [self._rand_column(count) for _ in range(3)]
+            # executemany consumes the zip iterator directly; no row list needed.
+            connection.executemany("INSERT INTO hulls VALUES (?, ?, ?, ?);", zip(range(1, count + 1), *columns))
+            logger.info(f"Populated {_N_HULLS} hulls.")
         except sqlite3.Error as e:
             logger.error(f"Error populating hulls: {e}")
             raise
 
-    def populate_engines(self) -> None:
-        cursor = self.connection.cursor()
+    def populate_engines(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        connection = connection or self.connection
         try:
-            for i in range(1, TableSizes.ENGINES.value + 1):
-                name = self._name("Engine", i)
-                values = (self._rand(), self._rand())
-                cursor.execute("INSERT OR REPLACE INTO engines VALUES (?, ?, ?);", (name, *values))
-            self.connection.commit()
-            logger.info(f"Populated {TableSizes.ENGINES.value} engines.")
+            count = _N_ENGINES
+            columns = [self._rand_column(count) for _ in range(2)]
+            # executemany consumes the zip iterator directly; no row list needed.
+            connection.executemany("INSERT INTO engines VALUES (?, ?, ?);", zip(range(1, count + 1), *columns))
+            logger.info(f"Populated {_N_ENGINES} engines.")
         except sqlite3.Error as e:
             logger.error(f"Error populating engines: {e}")
             raise
 
-    def populate_ships(self) -> None:
-        cursor = self.connection.cursor()
-        weapon_keys = [f"Weapon-{i}" for i in range(1, TableSizes.WEAPONS.value + 1)]
-        hull_keys = [f"Hull-{i}" for i in range(1, TableSizes.HULLS.value + 1)]
-        engine_keys = [f"Engine-{i}" for i in range(1, TableSizes.ENGINES.value + 1)]
-
+    def populate_ships(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        connection = connection or self.connection
         try:
-            for i in range(1, TableSizes.SHIPS.value + 1):
-                name = self._name("Ship", i)
-                weapon = random.choice(weapon_keys)
-                hull = random.choice(hull_keys)
-                engine = random.choice(engine_keys)
-                cursor.execute("INSERT OR REPLACE INTO ships VALUES (?, ?, ?, ?);", (name, weapon, hull, engine))
-            self.connection.commit()
-            logger.info(f"Populated {TableSizes.SHIPS.value} ships.")
+            count = _N_SHIPS
+            weapons = self._rng.choices(range(1, _N_WEAPONS + 1), k=count)
+            hulls = self._rng.choices(range(1, _N_HULLS + 1), k=count)
+            engines = self._rng.choices(range(1, _N_ENGINES + 1), k=count)
+            # executemany consumes the zip iterator directly; no row list needed.
+            connection.executemany("INSERT INTO ships VALUES (?, ?, ?, ?);", zip(range(1, count + 1), weapons, hulls, engines))
+            logger.info(f"Populated {_N_SHIPS} ships.")
         except sqlite3.Error as e:
             logger.error(f"Error populating ships: {e}")
             raise
 
     def populate_all(self) -> None:
-        """Orchestrate full schema creation and table population."""
+        """Orchestrate full schema creation and table population.
+
+        All inserts run inside a single transaction so the whole load pays
+        one commit instead of one per table.
+        """
         self.create_schema()
-        self.populate_weapons()
-        self.populate_hulls()
-        self.populate_engines()
-        self.populate_ships()
+        # FK values are drawn from the known-valid generated ranges, so
+        # per-row FK checks during the load are redundant; a single
+        # foreign_key_check afterwards validates the result instead.
+        # (The PRAGMA must be toggled outside the transaction to take effect.)
+        self.connection.execute("PRAGMA foreign_keys = OFF;")
+        self.connection.execute("BEGIN IMMEDIATE;")
+        try:
+            self.populate_weapons()
+            self.populate_hulls()
+            self.populate_engines()
+            self.populate_ships()
+            # Standard bulk-load pattern: index after the data lands, so the
+            # inserts themselves never pay B-tree maintenance on these columns.
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_ships_weapon ON ships(weapon_id);")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_ships_hull ON ships(hull_id);")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_ships_engine ON ships(engine_id);")
+            self.connection.execute("COMMIT;")
+        except Exception:
+            self.connection.execute("ROLLBACK;")
+            raise
+        finally:
+            self.connection.execute("PRAGMA foreign_keys = ON;")
+        violations = self.connection.execute("PRAGMA foreign_key_check;").fetchall()
+        if violations:
+            raise sqlite3.IntegrityError(f"Foreign key violations after bulk load: {violations}")
         logger.info("All tables populated successfully.")
 
+    def populate_all_fast(self) -> None:
+        """Build the full database in :memory: and stream it to disk.
+
+        Construction never touches the filesystem — no journal, no WAL,
+        no per-commit fsyncs — and backup() then writes the finished
+        database to self.connection in one page-level pass.
+        """
+        memory_connection = sqlite3.connect(":memory:", isolation_level=None)
+        try:
+            # backup() into a WAL-mode target requires matching page sizes.
+            memory_connection.execute("PRAGMA page_size = 8192;")
+            memory_connection.executescript(SCHEMA_SQL)
+            self.populate_weapons(memory_connection)
+            self.populate_hulls(memory_connection)
+            self.populate_engines(memory_connection)
+            self.populate_ships(memory_connection)
+            memory_connection.execute("CREATE INDEX idx_ships_weapon ON ships(weapon_id);")
+            memory_connection.execute("CREATE INDEX idx_ships_hull ON ships(hull_id);")
+            memory_connection.execute("CREATE INDEX idx_ships_engine ON ships(engine_id);")
+            memory_connection.backup(self.connection)
+        finally:
+            memory_connection.close()
+        violations = self.connection.execute("PRAGMA foreign_key_check;").fetchall()
+        if violations:
+            raise sqlite3.IntegrityError(f"Foreign key violations after bulk load: {violations}")
+        logger.info("All tables populated successfully (in-memory build).")
+
     # ------------------------------------ Cleanup ------------------------------------
     def close(self) -> None:
         if self.connection: